@@ -4,15 +4,16 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import contextlib
 import functools
 import getpass
 import json
 import logging
 import os
-from datetime import timedelta
-from itertools import chain
+from collections.abc import Callable, Generator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Literal, NamedTuple, Self, TypeAlias
+from typing import Any, Literal, NamedTuple, ParamSpec, Self, TypeAlias, TypeVar
 
 import apsw
 import apsw.bestpractice
@@ -30,6 +31,9 @@ try:
 except ModuleNotFoundError:
     uvloop = None
 
+P = ParamSpec("P")
+T = TypeVar("T")
+
 RadioInfoTuple: TypeAlias = tuple[int, int, str, int]
 
 # Set up logging.
@@ -38,7 +42,15 @@ discord.utils.setup_logging()
 _log = logging.getLogger(__name__)
 
 platformdir_info = platformdirs.PlatformDirs("discord-radiobot", "Sachaa-Thanasius", roaming=False)
-escape_markdown = functools.partial(discord.utils.escape_markdown, as_needed=True)
+
+# Locations of the bot's files. They're resolved, and created if necessary, when first used.
+DATABASE_PATH = platformdir_info.user_data_path / "radiobot_data.db"
+TREE_HASH_PATH = platformdir_info.user_cache_path / "radiobot_tree.hash"
+TOKEN_PATH = platformdir_info.user_config_path / "radiobot.token"
+LAVALINK_SECRETS_PATH = platformdir_info.user_config_path / "radiobot_lavalink.secrets"
+
+# The characters that discord.utils.escape_markdown(..., as_needed=True) may escape.
+MARKDOWN_CHARACTERS = frozenset("\\*`_~|>[#-")
 
 MUSIC_EMOJIS: dict[str, str] = {
     "youtube": "<:youtube:1108460195270631537>",
@@ -47,6 +59,15 @@ MUSIC_EMOJIS: dict[str, str] = {
     "spotify": "<:spotify:1108458132826501140>",
 }
 
+# WAL mode and foreign keys are already handled by apsw.bestpractice.
+CONNECTION_PRAGMAS: dict[str, int | str] = {
+    "synchronous": "NORMAL",  # Safe with WAL, and avoids an fsync on every commit.
+    "temp_store": "MEMORY",
+    "cache_size": -65536,  # In KiB, i.e. 64 MiB.
+    "mmap_size": 134217728,  # 128 MiB.
+    "journal_size_limit": 67108864,  # Truncate the WAL file back to at most 64 MiB after checkpoints.
+}
+
 INITIALIZATION_STATEMENTS = """
 CREATE TABLE IF NOT EXISTS guild_radios (
     guild_id        INTEGER         NOT NULL        PRIMARY KEY,
@@ -56,12 +77,8 @@ CREATE TABLE IF NOT EXISTS guild_radios (
 ) STRICT, WITHOUT ROWID;
 """
 
-SELECT_ALL_BY_GUILD_STATEMENT = """
-SELECT guild_id, channel_id, station_link, always_shuffle FROM guild_radios WHERE guild_id = ?;
-"""
-
-SELECT_ENABLED_GUILDS_STATEMENT = """
-SELECT guild_id FROM guild_radios;
+SELECT_ALL_RADIOS_STATEMENT = """
+SELECT guild_id, channel_id, station_link, always_shuffle FROM guild_radios;
 """
 
 UPSERT_GUILD_RADIO_STATEMENT = """
@@ -94,7 +111,7 @@ class GuildRadioInfo(NamedTuple):
     @classmethod
     def from_row(cls: type[Self], row: RadioInfoTuple) -> Self:
         guild_id, channel_id, station_link, always_shuffle = row
-        return cls(guild_id, channel_id, station_link, bool(always_shuffle))
+        return cls._make((guild_id, channel_id, station_link, bool(always_shuffle)))
 
     def display_embed(self) -> discord.Embed:
         """Format the radio's information into a Discord embed."""
@@ -107,39 +124,49 @@ class GuildRadioInfo(NamedTuple):
         )
 
 
-def _setup_db(conn: apsw.Connection) -> set[int]:
+def _setup_db(conn: apsw.Connection) -> dict[int, GuildRadioInfo]:
     with conn:
         cursor = conn.cursor()
         cursor.execute(INITIALIZATION_STATEMENTS)
-        cursor.execute(SELECT_ENABLED_GUILDS_STATEMENT)
-        return set(chain.from_iterable(cursor))
 
+        cursor.execute(SELECT_ALL_RADIOS_STATEMENT)
+        return {row[0]: GuildRadioInfo.from_row(row) for row in cursor}
 
-def _delete(conn: apsw.Connection, query_str: str, params: apsw.Bindings | None = None) -> None:
-    with conn:
-        cursor = conn.cursor()
-        cursor.execute(query_str, params)
 
+@contextlib.contextmanager
+def _write_transaction(cursor: apsw.Cursor) -> Generator[apsw.Cursor, None, None]:
+    """Run a block inside a transaction that takes the write lock immediately.
+
+    Unlike the deferred transaction from `with conn:`, this waits out the busy timeout for the write lock up front
+    instead of risking a BusyError when upgrading from a read lock partway through.
+    """
 
-def _query(conn: apsw.Connection, guild_ids: list[tuple[int]]) -> list[GuildRadioInfo]:
-    cursor = conn.cursor()
-    return [GuildRadioInfo.from_row(row) for row in cursor.executemany(SELECT_ALL_BY_GUILD_STATEMENT, guild_ids)]
+    cursor.execute("BEGIN IMMEDIATE;")
+    try:
+        yield cursor
+        cursor.execute("COMMIT;")
+    except BaseException:
+        # A failed COMMIT can leave the transaction open, and the cursor is shared, so always end it here. Don't let a
+        # failing rollback hide the original error.
+        if cursor.connection.in_transaction:
+            with contextlib.suppress(apsw.Error):
+                cursor.execute("ROLLBACK;")
+        raise
+
+
+def _delete(cursor: apsw.Cursor, query_str: str, params: apsw.Bindings | None = None) -> None:
+    with _write_transaction(cursor):
+        cursor.execute(query_str, params)
 
 
-def _add_radio(
-    conn: apsw.Connection,
-    *,
-    guild_id: int,
-    channel_id: int,
-    station_link: str,
-    always_shuffle: bool,
-) -> GuildRadioInfo | None:
-    with conn:
-        cursor = conn.cursor()
-        cursor.execute(UPSERT_GUILD_RADIO_STATEMENT, (guild_id, channel_id, station_link, always_shuffle))
-        # Throws an BusyError if not done like this.
-        rows = list(cursor)
-        return GuildRadioInfo.from_row(rows[0]) if rows[0] else None
+def _add_radio(cursor: apsw.Cursor, radio: GuildRadioInfo) -> GuildRadioInfo | None:
+    with _write_transaction(cursor):
+        # The radio's fields are in column order, so it can be bound as is.
+        cursor.execute(UPSERT_GUILD_RADIO_STATEMENT, radio)
+        # The transaction is committed through this same cursor, which finishes the statement, so the RETURNING row
+        # doesn't have to be drained first.
+        row = cursor.fetchone()
+        return GuildRadioInfo.from_row(row) if row else None
 
 
 def resolve_path_with_links(path: Path, folder: bool = False) -> Path:
@@ -148,36 +175,62 @@ def resolve_path_with_links(path: Path, folder: bool = False) -> Path:
     Python only resolves with strict=True if the path exists.
 
     Source: https://github.com/mikeshardmind/discord-rolebot/blob/4374149bc75d5a0768d219101b4dc7bff3b9e38e/rolebot.py#L350
+    Modified to walk the path iteratively instead of recursively.
     """
 
-    try:
-        return path.resolve(strict=True)
-    except FileNotFoundError:
-        path = resolve_path_with_links(path.parent, folder=True) / path.name
-        if folder:
-            path.mkdir(mode=0o700)  # python's default is world read/write/traversable... (0o777)
+    # Find the closest existing ancestor, then create whatever is missing beneath it from the top down.
+    missing_names: list[str] = []
+    existing = path
+    while not existing.exists():
+        missing_names.append(existing.name)
+        existing = existing.parent
+
+    resolved = existing.resolve(strict=True)
+    for depth, name in enumerate(reversed(missing_names), start=1):
+        resolved /= name
+        if folder or depth < len(missing_names):
+            resolved.mkdir(mode=0o700)  # python's default is world read/write/traversable... (0o777)
         else:
-            path.touch(mode=0o600)  # python's default is world read/writable... (0o666)
-        return path.resolve(strict=True)
+            resolved.touch(mode=0o600)  # python's default is world read/writable... (0o666)
 
+    return resolved
 
-async def create_track_embed(title: str, track: wavelink.Playable) -> discord.Embed:
-    """Modify an embed to show information about a Wavelink track."""
 
-    icon = MUSIC_EMOJIS.get(track.source, "\N{MUSICAL NOTE}")
-    title = f"{icon} {title}"
-    uri = track.uri or ""
-    author = escape_markdown(track.author)
-    track_title = escape_markdown(track.title)
+def escape_markdown(text: str) -> str:
+    """Escape markdown in text as needed, skipping discord.py's regexes if the text can't contain any markdown."""
 
-    try:
-        end_time = timedelta(seconds=track.length // 1000)
-    except OverflowError:
+    if MARKDOWN_CHARACTERS.isdisjoint(text):
+        return text
+    return discord.utils.escape_markdown(text, as_needed=True)
+
+
+@functools.lru_cache(maxsize=256)
+def _format_track_details(source: str, uri: str, author: str, title: str, length: int | None) -> tuple[str, str]:
+    """Get the icon and description for a track's embed. A length of None denotes a stream.
+
+    Radios loop over the same tracks, so these are cached instead of being reformatted on every play.
+    """
+
+    icon = MUSIC_EMOJIS.get(source, "\N{MUSICAL NOTE}")
+    author = escape_markdown(author)
+    title = escape_markdown(title)
+
+    if length is None:
         end_time = "\N{INFINITY}"
+    else:
+        minutes, seconds = divmod(length // 1000, 60)
+        hours, minutes = divmod(minutes, 60)
+        end_time = f"{hours}:{minutes:02}:{seconds:02}"
 
-    description = f"[{track_title}]({uri})\n{author}\n`[0:00-{end_time}]`"
+    return icon, f"[{title}]({uri})\n{author}\n`[0:00-{end_time}]`"
 
-    embed = discord.Embed(color=0x0389DA, title=title, description=description)
+
+async def create_track_embed(title: str, track: wavelink.Playable) -> discord.Embed:
+    """Modify an embed to show information about a Wavelink track."""
+
+    length = None if track.is_stream else track.length
+    icon, description = _format_track_details(track.source, track.uri or "", track.author, track.title, length)
+    embed = discord.Embed(color=0x0389DA, title=f"{icon} {title}", description=description)
 
     if track.artwork:
         embed.set_thumbnail(url=track.artwork)
@@ -234,9 +287,7 @@ async def radio_get(itx: discord.Interaction[RadioBot]) -> None:
 
     assert itx.guild_id  # Known at runtime.
 
-    local_radio_results = _query(itx.client.db_connection, [(itx.guild_id,)])
-
-    if local_radio_results and (local_radio := local_radio_results[0]):
+    if local_radio := itx.client.get_radio(itx.guild_id):
         await itx.response.send_message(embed=local_radio.display_embed())
     else:
         await itx.response.send_message("No radio found for this guild.")
@@ -265,9 +316,7 @@ async def radio_restart(itx: discord.Interaction[RadioBot]) -> None:
     if vc := itx.guild.voice_client:
         await vc.disconnect(force=True)
 
-    guild_radio_records = _query(itx.client.db_connection, [(itx.guild.id,)])
-
-    if guild_radio_records:
+    if itx.client.get_radio(itx.guild.id):
         await itx.response.send_message("Restarting radio now. Give it a few seconds to rejoin.")
     else:
         await itx.response.send_message("This server's radio does not exist. Not restarting.")
@@ -350,6 +399,22 @@ async def volume(itx: discord.Interaction[RadioBot], volume: int | None = None)
         await itx.response.send_message("No radio currently active in this server.")
 
 
+@functools.cache
+def _get_help_description(command: app_commands.Command[Any, ..., Any] | app_commands.Group) -> str:
+    """Get a command's description for /help, i.e. its docstring without the parameters section.
+
+    Docstrings don't change at runtime, so this is only computed once per command.
+    """
+
+    if isinstance(command, app_commands.Command):
+        description = command.callback.__doc__ or command.description
+    else:
+        description = command.__doc__ or command.description
+
+    index = description.find("Parameters")
+    return description[:index] if index != -1 else description
+
+
 @app_commands.command(name="help")
 async def _help(itx: discord.Interaction[RadioBot], ephemeral: bool = True) -> None:
     """See a brief overview of all the bot's available commands and basic instructions for setting it up.
@@ -377,19 +442,9 @@ async def _help(itx: discord.Interaction[RadioBot], ephemeral: bool = True) -> N
     for cmd in itx.client.tree.walk_commands():
         if isinstance(cmd, app_commands.Command):
             mention = await itx.client.tree.find_mention_for(cmd)
-            description = cmd.callback.__doc__ or cmd.description
         else:
             mention = f"/{cmd.name}"
-            description = cmd.__doc__ or cmd.description
-
-        try:
-            index = description.index("Parameters")
-        except ValueError:
-            pass
-        else:
-            description = description[:index]
-
-        help_embed.add_field(name=mention, value=description, inline=False)
+        help_embed.add_field(name=mention, value=_get_help_description(cmd), inline=False)
 
     await itx.response.send_message(embed=help_embed, ephemeral=ephemeral)
 
@@ -442,11 +497,12 @@ class RadioPlayer(wavelink.Player):
             await self.channel.send(embed=embed)
             return
 
+        # Nothing else fills this queue concurrently, so skip put_wait's lock and extend the queue directly.
         if isinstance(tracks, wavelink.Playlist):
-            await self.queue.put_wait(tracks)
+            self.queue.put(tracks)
         else:
             track: wavelink.Playable = tracks[0]
-            await self.queue.put_wait(track)
+            self.queue.put(track)
 
         self.autoplay = wavelink.AutoPlayMode.partial
         self.queue.mode = wavelink.QueueMode.loop_all
@@ -468,10 +524,12 @@ class VersionableTree(app_commands.CommandTree):
     def __init__(self, client: RadioBot, *, fallback_to_global: bool = True) -> None:
         super().__init__(client, fallback_to_global=fallback_to_global)
         self.application_commands: dict[int | None, list[app_commands.AppCommand]] = {}
+        self._mention_cache: dict[tuple[str, int | None], str | None] = {}
 
     async def sync(self, *, guild: discord.abc.Snowflake | None = None) -> list[app_commands.AppCommand]:
         ret = await super().sync(guild=guild)
         self.application_commands[guild.id if guild else None] = ret
+        self._mention_cache.clear()
         return ret
 
     async def fetch_commands(
@@ -481,6 +539,7 @@ class VersionableTree(app_commands.CommandTree):
     ) -> list[app_commands.AppCommand]:
         ret = await super().fetch_commands(guild=guild)
         self.application_commands[guild.id if guild else None] = ret
+        self._mention_cache.clear()
         return ret
 
     async def find_mention_for(
@@ -499,8 +558,28 @@ class VersionableTree(app_commands.CommandTree):
             The scope (guild) from which to retrieve the commands from. If None is given or not passed,
             the global scope will be used, however, if guild is passed and tree.fallback_to_global is
             set to True (default), then the global scope will also be searched.
+
+        Notes
+        -----
+        Results are cached until the tree is next synced or its commands are refetched.
         """
 
+        cache_key = (command if isinstance(command, str) else command.qualified_name, guild.id if guild else None)
+        try:
+            return self._mention_cache[cache_key]
+        except KeyError:
+            pass
+
+        mention = await self._find_mention_for(command, guild=guild)
+        self._mention_cache[cache_key] = mention
+        return mention
+
+    async def _find_mention_for(
+        self,
+        command: app_commands.Command[Any, ..., Any] | app_commands.Group | str,
+        *,
+        guild: discord.abc.Snowflake | None = None,
+    ) -> str | None:
         check_global = (self.fallback_to_global is True) or (guild is not None)
 
         if isinstance(command, str):
@@ -541,18 +620,22 @@ class VersionableTree(app_commands.CommandTree):
 
         return f"</{_command.qualified_name}:{app_command_found.id}>"
 
-    async def get_hash(self) -> bytes:
+    async def get_hash(self) -> int:
         """Generate a unique hash to represent all commands currently in the tree."""
 
         commands = sorted(self._get_all_commands(guild=None), key=lambda c: c.qualified_name)
 
+        # Feed the commands to the hasher one at a time instead of serializing the whole tree at once.
+        hasher = xxhash.xxh3_64(seed=1)
         translator = self.translator
-        if translator:
-            payload = [await command.get_translated_payload(self, translator) for command in commands]
-        else:
-            payload = [command.to_dict(self) for command in commands]
+        for command in commands:
+            if translator:
+                payload = await command.get_translated_payload(self, translator)
+            else:
+                payload = command.to_dict(self)
+            hasher.update(json.dumps(payload, separators=(",", ":")).encode())
 
-        return xxhash.xxh3_64_digest(json.dumps(payload).encode("utf-8"), seed=1)
+        return hasher.intdigest()
 
     async def sync_if_commands_updated(self) -> None:
         """Sync the tree globally if its commands are different from the tree's most recent previous version.
@@ -566,15 +649,17 @@ class VersionableTree(app_commands.CommandTree):
         """
 
         tree_hash = await self.get_hash()
-        tree_hash_path = platformdir_info.user_cache_path / "radiobot_tree.hash"
-        tree_hash_path = resolve_path_with_links(tree_hash_path)
+        tree_hash_path = resolve_path_with_links(TREE_HASH_PATH)
+        hash_size = 8  # xxh3_64 produces 64-bit hashes.
         with tree_hash_path.open("r+b") as fp:
-            data = fp.read()
-            if data != tree_hash:
+            # A stored hash of the wrong size can't match, so don't bother reading it.
+            stored_hash = int.from_bytes(fp.read()) if os.fstat(fp.fileno()).st_size == hash_size else None
+            if stored_hash != tree_hash:
                 _log.info("New version of the command tree. Syncing now.")
                 await self.sync()
                 fp.seek(0)
-                fp.write(tree_hash)
+                fp.write(tree_hash.to_bytes(hash_size))
+                fp.truncate()
 
 
 class RadioBot(discord.AutoShardedClient):
@@ -601,9 +686,16 @@ class RadioBot(discord.AutoShardedClient):
 
         # Connect to the database that will store the radio information.
         # -- Need to account for the directories and/or file not existing.
-        db_path = platformdir_info.user_data_path / "radiobot_data.db"
-        resolved_path_as_str = str(resolve_path_with_links(db_path))
+        resolved_path_as_str = str(resolve_path_with_links(DATABASE_PATH))
         self.db_connection = apsw.Connection(resolved_path_as_str)
+        self.db_connection.set_busy_timeout(5000)
+        for pragma, value in CONNECTION_PRAGMAS.items():
+            self.db_connection.pragma(pragma, value)
+
+        # Run every write through the same cursor so the connection's statement cache always hits. Cursors can't be
+        # used from multiple threads at once, so all database work happens on one thread.
+        self._write_cursor = self.db_connection.cursor()
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="radiobot-db")
 
     async def on_connect(self) -> None:
         """(Re)set the client's general invite link every time it (re)connects to the Discord Gateway."""
@@ -620,8 +712,9 @@ class RadioBot(discord.AutoShardedClient):
         node = wavelink.Node(uri=self.config.uri, password=self.config.password)
         await wavelink.Pool.connect(nodes=[node], client=self)
 
-        # Initialize the database and start the loop.
-        self._radio_enabled_guilds: set[int] = _setup_db(self.db_connection)
+        # Initialize the database, load the radios into memory, and start the loop.
+        self._radio_cache: dict[int, GuildRadioInfo] = await self.run_db(_setup_db, self.db_connection)
+        self._radio_start_semaphore = asyncio.Semaphore(8)
         self.radio_loop.start()
 
         # Add the app commands to the tree.
@@ -631,10 +724,24 @@ class RadioBot(discord.AutoShardedClient):
         # Sync the tree if it's different from the previous version, using hashing for comparison.
         await self.tree.sync_if_commands_updated()
 
+        # Have the global commands on hand before any interaction needs their mentions.
+        if None not in self.tree.application_commands:
+            await self.tree.fetch_commands()
+
     async def close(self) -> None:
         self.radio_loop.cancel()
         await super().close()
 
+        # Let any pending database work finish off the event loop before closing the connection it uses.
+        await asyncio.to_thread(self._db_executor.shutdown)
+        self.db_connection.close()
+
+    async def run_db(self, func: Callable[P, T], /, *args: P.args, **kwargs: P.kwargs) -> T:
+        """Run a blocking database function on the bot's dedicated database thread."""
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, functools.partial(func, *args, **kwargs))
+
     async def start_guild_radio(self, radio_info: GuildRadioInfo) -> None:
         """Create a radio voice client for a guild and start its preset station playlist.
 
@@ -652,12 +759,14 @@ class RadioBot(discord.AutoShardedClient):
         voice_channel = guild.get_channel(radio_info.channel_id)
         assert isinstance(voice_channel, discord.VoiceChannel | discord.StageChannel)
 
-        vc = await voice_channel.connect(cls=RadioPlayer)
-        vc.radio_info = radio_info
+        # Limit how many radios connect and load their stations at once so Discord and Lavalink aren't flooded.
+        async with self._radio_start_semaphore:
+            vc = await voice_channel.connect(cls=RadioPlayer)
+            vc.radio_info = radio_info
 
-        # Get the playlist of the guild's registered radio station and play it on loop.
-        await vc.regenerate_radio_queue()
-        await vc.play(vc.queue.get())
+            # Get the playlist of the guild's registered radio station and play it on loop.
+            await vc.regenerate_radio_queue()
+            await vc.play(vc.queue.get())
 
     @tasks.loop(seconds=10.0)
     async def radio_loop(self) -> None:
@@ -666,21 +775,42 @@ class RadioBot(discord.AutoShardedClient):
         It (re)connects voice clients to voice channels and plays preset stations.
         """
 
-        inactive_radio_guild_ids = [
-            guild_id
-            for guild_id in self._radio_enabled_guilds
+        inactive_radios = [
+            radio
+            for guild_id, radio in self._radio_cache.items()
             if (guild := self.get_guild(guild_id)) and not guild.voice_client
         ]
+        if not inactive_radios:
+            return
 
-        radio_results = _query(self.db_connection, [(guild_id,) for guild_id in inactive_radio_guild_ids])
-
-        for radio in radio_results:
-            self.loop.create_task(self.start_guild_radio(radio))
+        results = await asyncio.gather(*map(self.start_guild_radio, inactive_radios), return_exceptions=True)
+        for radio, result in zip(inactive_radios, results, strict=True):
+            if isinstance(result, BaseException):
+                _log.error("Failed to start the radio in guild %s.", radio.guild_id, exc_info=result)
 
     @radio_loop.before_loop
     async def radio_loop_before(self) -> None:
         await self.wait_until_ready()
 
+    def get_radio(self, guild_id: int) -> GuildRadioInfo | None:
+        """Get a guild's radio from the in-memory cache.
+
+        The cache is loaded with every radio at startup and kept in sync with the database on every write, so there's
+        no need to query the database for this.
+
+        Parameters
+        ----------
+        guild_id : int
+            The Discord ID of the guild.
+
+        Returns
+        -------
+        GuildRadioInfo | None
+            A dataclass instance with information about the guild's radio, or None if it doesn't have one.
+        """
+
+        return self._radio_cache.get(guild_id)
+
     async def save_radio(
         self,
         guild_id: int,
@@ -708,14 +838,15 @@ class RadioBot(discord.AutoShardedClient):
             failed.
         """
 
-        record = _add_radio(
-            self.db_connection,
-            guild_id=guild_id,
-            channel_id=channel_id,
-            station_link=station_link,
-            always_shuffle=always_shuffle,
-        )
-        self._radio_enabled_guilds.add(guild_id)
+        radio = GuildRadioInfo(guild_id, channel_id, station_link, always_shuffle)
+
+        # Repeating the current settings doesn't need a write.
+        if (cached_radio := self._radio_cache.get(guild_id)) == radio:
+            return cached_radio
+
+        record = await self.run_db(_add_radio, self._write_cursor, radio)
+        if record:
+            self._radio_cache[guild_id] = record
 
         if (guild := self.get_guild(guild_id)) and isinstance((vc := guild.voice_client), RadioPlayer) and record:
             old_record = vc.radio_info
@@ -734,25 +865,21 @@ class RadioBot(discord.AutoShardedClient):
             The Discord ID of the guild.
         """
 
-        record = await asyncio.to_thread(_delete, self.db_connection, DELETE_RADIO_BY_GUILD_STATEMENT, (guild_id,))
-        self._radio_enabled_guilds.discard(guild_id)
+        await self.run_db(_delete, self._write_cursor, DELETE_RADIO_BY_GUILD_STATEMENT, (guild_id,))
+        self._radio_cache.pop(guild_id, None)
 
         if (guild := self.get_guild(guild_id)) and (vc := guild.voice_client):
             await vc.disconnect(force=True)
 
-        return record
-
 
-def _get_stored_credentials(filename: str) -> tuple[str, ...] | None:
-    secret_file_path = platformdir_info.user_config_path / filename
-    secret_file_path = resolve_path_with_links(secret_file_path)
-    with secret_file_path.open("r", encoding="utf-8") as fp:
-        return tuple(base2048.decode(line.removesuffix("\n")).decode("utf-8") for line in fp.readlines())
+def _get_stored_credentials(path: Path) -> tuple[str, ...]:
+    secret_file_path = resolve_path_with_links(path)
+    lines = secret_file_path.read_text(encoding="utf-8").splitlines()
+    return tuple(base2048.decode(line).decode("utf-8") for line in lines)
 
 
-def _store_credentials(filename: str, *credentials: str) -> None:
-    secret_file_path = platformdir_info.user_config_path / filename
-    secret_file_path = resolve_path_with_links(secret_file_path)
+def _store_credentials(path: Path, *credentials: str) -> None:
+    secret_file_path = resolve_path_with_links(path)
     with secret_file_path.open("w", encoding="utf-8") as fp:
         for cred in credentials:
             fp.write(base2048.encode(cred.encode()))
@@ -765,7 +892,7 @@ def _input_token() -> None:
     if not token:
         msg = "Not storing empty token."
         raise RuntimeError(msg)
-    _store_credentials("radiobot.token", token)
+    _store_credentials(TOKEN_PATH, token)
 
 
 def _input_lavalink_creds() -> None:
@@ -780,24 +907,24 @@ def _input_lavalink_creds() -> None:
             msg = "Not storing empty lavalink cred."
             raise RuntimeError(msg)
         creds.append(secret)
-    _store_credentials("radiobot_lavalink.secrets", *creds)
+    _store_credentials(LAVALINK_SECRETS_PATH, *creds)
 
 
 def _get_token() -> str:
-    token = os.getenv("DISCORD_TOKEN") or _get_stored_credentials("radiobot.token")
-    if token is None:
+    token = os.getenv("DISCORD_TOKEN") or next(iter(_get_stored_credentials(TOKEN_PATH)), None)
+    if not token:
         msg = (
             "You're missing a Discord bot token. Use '--token' in the CLI to trigger setup for it, or provide an "
             "environmental variable labelled 'DISCORD_TOKEN'."
         )
         raise RuntimeError(msg)
-    return token[0] if isinstance(token, tuple) else token
+    return token
 
 
 def _get_lavalink_creds() -> LavalinkCreds:
     if (ll_uri := os.getenv("LAVALINK_URI")) and (ll_pwd := os.getenv("LAVALINK_PASSWORD")):
         lavalink_creds = LavalinkCreds(ll_uri, ll_pwd)
-    elif ll_creds := _get_stored_credentials("radiobot_lavalink.secrets"):
+    elif ll_creds := _get_stored_credentials(LAVALINK_SECRETS_PATH):
         lavalink_creds = LavalinkCreds(ll_creds[0], ll_creds[1])
     else:
         msg = (
@@ -820,9 +947,10 @@ def run_client() -> None:
 
     client = RadioBot(lavalink_creds)
 
-    loop = uvloop.new_event_loop if (uvloop is not None) else None  # type: ignore
-    with asyncio.Runner(loop_factory=loop) as runner:  # type: ignore
-        runner.run(bot_runner(client))
+    if uvloop is not None:
+        uvloop.run(bot_runner(client))  # type: ignore
+    else:
+        asyncio.run(bot_runner(client))
 
 
 def main() -> None: